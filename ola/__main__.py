@@ -0,0 +1,18 @@
+import os
+
+import uvicorn
+from dotenv import load_dotenv
+
+# The server settings below can come from .env as well, ola.main only loads it inside the workers
+load_dotenv()
+
+# Each worker imports ola.main itself, so the database and HTTP client are set up per process
+uvicorn.run(
+    "ola.main:app",
+    host=os.getenv("HOST", "0.0.0.0"),
+    port=int(os.getenv("PORT", "8000")),
+    # uvloop and httptools are picked up when installed, uvloop is not available on Windows
+    loop="auto",
+    http="auto",
+    workers=int(os.getenv("WORKERS", "1")),
+)
@@ -0,0 +1,52 @@
+import deflate
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Already compressed payloads that are not worth gzipping again
+PRECOMPRESSED_CONTENT_TYPES = ("application/zip",)
+
+
+class LibdeflateGZipResponder(GZipResponder):
+    """GZip responder that compresses whole bodies with libdeflate, streamed bodies still go through gzip.GzipFile"""
+
+    def __init__(self, app, minimum_size: int, compresslevel: int = 6) -> None:
+        super().__init__(app, minimum_size, compresslevel=compresslevel)
+        self.compresslevel = compresslevel
+        self.streaming = False
+
+    async def send_with_compression(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            # Gzip and identity bodies would otherwise share one strong validator, letting a shared cache that
+            # revalidates with it hand gzip bytes to a client that never asked for them
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/") and not content_type.startswith(PRECOMPRESSED_CONTENT_TYPES):
+                headers["etag"] = "W/" + etag
+            await super().send_with_compression(message)
+            self.content_type_is_excluded |= content_type.startswith(PRECOMPRESSED_CONTENT_TYPES)
+            return
+        await super().send_with_compression(message)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if not more_body and not self.streaming:
+            return deflate.gzip_compress(body, self.compresslevel)
+        self.streaming = True
+        return super().apply_compression(body, more_body=more_body)
+
+
+class LibdeflateGZipMiddleware(GZipMiddleware):
+    """Starlette's GZipMiddleware, with single-body responses compressed by libdeflate"""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = LibdeflateGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+
+        await responder(scope, receive, send)
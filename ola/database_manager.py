@@ -1,12 +1,41 @@
-import hashlib
-import json
+import atexit
+import os
+import queue
+import sqlite3
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import blake3
+import orjson
 import polars as pl
 from .logger import logger as log
 
+# Search results are considered fresh for 24 hours
+SEARCH_CACHE_TTL = 86400
+
+# Number of search results kept in memory in front of SQLite
+SEARCH_CACHE_MEMORY_SIZE = 1024
+
+# Raw upstream search responses are kept this long, so they can be revalidated with If-None-Match
+UPSTREAM_CACHE_TTL = 7 * 86400
+
+# Writer thread commits at most this many queued writes per transaction,
+# waiting up to WRITE_BATCH_DELAY seconds for a batch to fill up
+WRITE_BATCH_SIZE = 256
+WRITE_BATCH_DELAY = 0.05
+
+# Number of decoded subtitle/file info entries kept in the LRU
+INFO_CACHE_SIZE = 4096
+
+# Columns of the files table after the key, in order
+FILE_COLUMNS = ("file_path", "original_filename", "stored_at")
+
+# (imdb_id, season, episode, language, with_subdl)
+SearchCacheKey = Tuple[str, Optional[str], Optional[str], str, bool]
+
 
 class DatabaseManager:
     def __init__(self, storage_dir: str = "subtitles", data_dir: str = "data"):
@@ -15,215 +44,425 @@ class DatabaseManager:
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
 
-        # CSV file paths
+        self.db_path = self.data_dir / "ola.db"
+
+        # Legacy CSV file paths, imported into SQLite once
         self.subtitles_csv = self.data_dir / "subtitles.csv"
         self.files_csv = self.data_dir / "files.csv"
         self.search_cache_csv = self.data_dir / "search_cache.csv"
 
-        # In-memory DataFrames for fast access
-        self._subtitles_df = None
-        self._files_df = None
-        self._search_cache_df = None
+        # Read connection, all writes after startup go through the writer thread
+        self.conn = self._connect()
 
-        self._load_databases()
+        # In-process search cache of serialized results keyed on the raw tuple, only hashed when it has to hit SQLite
+        self._search_cache: Dict[SearchCacheKey, Tuple[float, bytes, str]] = {}
 
-    def _load_databases(self):
-        """Load databases from CSV files"""
-        # Define schema to ensure key is always string
-        schema = {"key": pl.String, "value": pl.String}
+        # LRU of decoded subtitle/file info keyed on (table, key), file info is written through on store, subtitle info only cached on read
+        self._info_cache: OrderedDict[Tuple[str, str], Dict[str, Any]] = OrderedDict()
 
-        # Load subtitles
-        if Path(self.subtitles_csv).exists():
-            self._subtitles_df = pl.read_csv(self.subtitles_csv, schema=schema)
-        else:
-            self._subtitles_df = pl.DataFrame({"key": [], "value": []}, schema=schema)
-            self._subtitles_df.write_csv(self.subtitles_csv)
-
-        # Load files
-        if Path(self.files_csv).exists():
-            self._files_df = pl.read_csv(self.files_csv, schema=schema)
-        else:
-            self._files_df = pl.DataFrame({"key": [], "value": []}, schema=schema)
-            self._files_df.write_csv(self.files_csv)
-
-        # Load search cache
-        if Path(self.search_cache_csv).exists():
-            self._search_cache_df = pl.read_csv(self.search_cache_csv, schema=schema)
-        else:
-            self._search_cache_df = pl.DataFrame({"key": [], "value": []}, schema=schema)
-            self._search_cache_df.write_csv(self.search_cache_csv)
-
-    def _save_subtitles(self):
-        """Save subtitles DataFrame to CSV"""
-        self._subtitles_df.write_csv(self.subtitles_csv)
-
-    def _save_files(self):
-        """Save files DataFrame to CSV"""
-        self._files_df.write_csv(self.files_csv)
-
-    def _save_search_cache(self):
-        """Save search cache DataFrame to CSV"""
-        self._search_cache_df.write_csv(self.search_cache_csv)
+        # Rows queued for the writer but not committed yet, so reads see their own writes
+        self._pending: Dict[Tuple[str, str], tuple] = {}
+        self._pending_lock = threading.Lock()
 
-    def generate_cache_key(self, imdb_id: str, season: str, episode: str, language: str) -> str:
-        """Generate a cache key for search results"""
-        return hashlib.md5(f"{imdb_id}:{season}:{episode}:{language}".encode()).hexdigest()
-
-    def get_search_cache(self, cache_key: str) -> Optional[Dict[str, Any]]:
-        """Get cached search results"""
-        # Use Polars filter for fast lookup
-        result = self._search_cache_df.filter(pl.col("key") == cache_key)
-
-        if result.height > 0:
-            cache_entry = json.loads(result.select("value").item())
-            # Check if cache is still valid (24 hours)
-            if time.time() - cache_entry["timestamp"] < 86400:
-                return cache_entry["data"]
-            else:
-                # Remove expired cache
-                self._search_cache_df = self._search_cache_df.filter(pl.col("key") != cache_key)
-                self._save_search_cache()
-        return None
+        self._create_tables()
+        self._import_legacy_csv()
 
-    def set_search_cache(self, cache_key: str, data: Dict[str, Any]):
-        """Cache search results"""
-        cache_entry = {"data": data, "timestamp": time.time()}
-        cache_json = json.dumps(cache_entry, ensure_ascii=False)
+        # File ids whose .srt is known to be on disk
+        self._present_file_ids = self._scan_storage(self.conn)
 
-        # Remove existing entry if it exists
-        self._search_cache_df = self._search_cache_df.filter(pl.col("key") != cache_key)
+        self._write_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._writer_loop, name="db-writer", daemon=True)
+        self._writer.start()
 
-        # Add new entry
-        new_row = pl.DataFrame([{"key": cache_key, "value": cache_json}])
-        self._search_cache_df = pl.concat([self._search_cache_df, new_row])
-        self._save_search_cache()
+        # Make sure queued writes are flushed and the WAL is folded back into the main database on shutdown
+        atexit.register(self.close)
 
-    def store_subtitle_info(self, file_id: str, subtitle_id: str, subtitle_info: Dict[str, Any]):
-        """Store subtitle metadata"""
-        subtitle_data = {
-            **subtitle_info,
-            "file_id": file_id,
-            "stored_at": time.time(),
-        }
-        subtitle_json = json.dumps(subtitle_data, ensure_ascii=False)
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the database in autocommit mode"""
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _writer_loop(self):
+        """Apply queued writes in batches, one transaction per batch"""
+        conn = self._connect()
+        running = True
+        while running:
+            batch = [self._write_queue.get()]
+            deadline = time.monotonic() + WRITE_BATCH_DELAY
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._write_queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+
+            # None is the shutdown sentinel, write whatever was queued before it
+            if None in batch:
+                batch = batch[: batch.index(None)]
+                running = False
+
+            # Any error is logged and the loop carries on, a dead writer would silently drop every later write
+            try:
+                self._apply_writes(conn, batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    log.error("Error writing %d queued rows: %s", len(batch[0][1]), e)
+                else:
+                    # Retry each write in its own transaction so one bad statement doesn't lose the rest of the batch
+                    log.warning("Error writing a batch of %d queued writes, retrying them one by one: %s", len(batch), e)
+                    for write in batch:
+                        try:
+                            self._apply_writes(conn, [write])
+                        except Exception as e:
+                            log.error("Error writing %d queued rows: %s", len(write[1]), e)
+
+            with self._pending_lock:
+                for _, rows, pending_keys in batch:
+                    for params, pending_key in zip(rows, pending_keys):
+                        # Only drop the overlay if it wasn't overwritten while this batch was in flight
+                        if pending_key and self._pending.get(pending_key) is params:
+                            del self._pending[pending_key]
+
+        conn.execute("PRAGMA optimize")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+
+    def _apply_writes(self, conn: sqlite3.Connection, writes: List[tuple]):
+        """Run queued writes in one transaction, rolling back if any of them fails"""
+        try:
+            conn.execute("BEGIN")
+            for sql, rows, _ in writes:
+                conn.executemany(sql, rows)
+            conn.execute("COMMIT")
+        except BaseException:
+            # SQLite may already have rolled back on its own, e.g. after SQLITE_FULL or an I/O error on COMMIT
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def _queue_write(self, sql: str, params: tuple, pending_key: Optional[Tuple[str, str]] = None):
+        """Hand a write to the writer thread, optionally exposing its row to reads until committed"""
+        self._queue_writes(sql, [params], [pending_key])
+
+    def _queue_writes(self, sql: str, rows: List[tuple], pending_keys: List[Optional[Tuple[str, str]]]):
+        """Hand one statement with many rows to the writer thread, which runs it with executemany"""
+        with self._pending_lock:
+            for params, pending_key in zip(rows, pending_keys):
+                if pending_key:
+                    self._pending[pending_key] = params
+        self._write_queue.put((sql, rows, pending_keys))
+
+    def _get_row(self, table: str, columns: str, key: str) -> Optional[tuple]:
+        """Read a row by key, preferring writes that are still queued"""
+        row = self._pending.get((table, key))
+        if row is None:
+            row = self.conn.execute(f"SELECT key, {columns} FROM {table} WHERE key = ?", (key,)).fetchone()
+        return row
+
+    def _scan_storage(self, conn: sqlite3.Connection) -> set:
+        """Collect stored file ids that have their .srt in the storage directory"""
+        with os.scandir(self.storage_dir) as entries:
+            srt_ids = {entry.name[:-4] for entry in entries if entry.name.endswith(".srt")}
+        stored_ids = {key for (key,) in conn.execute("SELECT key FROM files")}
+        return srt_ids & stored_ids
+
+    def _cache_info(self, table: str, key: str, info: Dict[str, Any]):
+        """Put decoded info into the LRU, evicting the least recently used entry when full"""
+        self._info_cache[(table, key)] = info
+        self._info_cache.move_to_end((table, key))
+        if len(self._info_cache) > INFO_CACHE_SIZE:
+            self._info_cache.popitem(last=False)
+
+    def _cached_info(self, table: str, key: str) -> Optional[Dict[str, Any]]:
+        """Get decoded info from the LRU, marking it as recently used"""
+        info = self._info_cache.get((table, key))
+        if info is not None:
+            self._info_cache.move_to_end((table, key))
+        return info
+
+    def _create_tables(self):
+        """Create tables and indexes if they don't exist"""
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS subtitles(key TEXT PRIMARY KEY, value BLOB NOT NULL, stored_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS files(
+                key TEXT PRIMARY KEY,
+                file_path TEXT NOT NULL,
+                original_filename TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS search_cache(key TEXT PRIMARY KEY, data BLOB NOT NULL, timestamp REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS upstream_cache(key TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, fetched_at REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS idx_subtitles_stored_at ON subtitles(stored_at);
+            CREATE INDEX IF NOT EXISTS idx_files_stored_at ON files(stored_at);
+            CREATE INDEX IF NOT EXISTS idx_search_cache_timestamp ON search_cache(timestamp);
+            CREATE INDEX IF NOT EXISTS idx_upstream_cache_fetched_at ON upstream_cache(fetched_at);
+            """)
+
+    def _import_legacy_csv(self):
+        """Import key/value CSV files written by older versions, then rename them out of the way"""
+        schema = {"key": pl.String, "value": pl.String}
 
-        # Remove existing entry if it exists
-        self._subtitles_df = self._subtitles_df.filter(pl.col("key") != subtitle_id)
+        # Cached searches were keyed on MD5 hashes back then and can never match a lookup now, so they aren't imported
+        if self.search_cache_csv.exists():
+            self.search_cache_csv.rename(self.search_cache_csv.with_suffix(".csv.imported"))
+            log.info("Skipped importing stale search cache %s", self.search_cache_csv)
+
+        for csv_path, table in ((self.subtitles_csv, "subtitles"), (self.files_csv, "files")):
+            if not csv_path.exists():
+                continue
+
+            # Extract the timestamp inside Polars instead of decoding every row in Python
+            lf = pl.scan_csv(csv_path, schema=schema, low_memory=True)
+            if table == "files":
+                lf = lf.select(
+                    "key",
+                    *(pl.col("value").str.json_path_match(f"$.{column}").alias(column) for column in FILE_COLUMNS[:-1]),
+                    pl.col("value").str.json_path_match("$.stored_at").cast(pl.Float64).alias("stored_at"),
+                )
+            else:
+                lf = lf.select("key", "value", pl.col("value").str.json_path_match("$.stored_at").cast(pl.Float64).alias("stored_at"))
+            df = lf.collect()
+            rows = df.rows()
+            placeholders = ", ".join("?" * df.width)
 
-        # Add new entry
-        new_row = pl.DataFrame([{"key": subtitle_id, "value": subtitle_json}])
-        self._subtitles_df = pl.concat([self._subtitles_df, new_row])
-        self._save_subtitles()
+            self.conn.execute("BEGIN")
+            self.conn.executemany(f"INSERT OR REPLACE INTO {table} VALUES ({placeholders})", rows)
+            self.conn.execute("COMMIT")
 
-    def store_file_info(self, file_id: str, file_path: str, zip_path: str, original_filename: str):
-        """Store file information"""
-        file_data = {
-            "file_path": file_path,
-            "zip_path": zip_path,
-            "original_filename": original_filename,
-            "stored_at": time.time(),
-        }
-        file_json = json.dumps(file_data, ensure_ascii=False)
+            csv_path.rename(csv_path.with_suffix(".csv.imported"))
+            log.info("Imported %d rows from %s into %s", len(rows), csv_path, table)
 
-        # Remove existing entry if it exists
-        self._files_df = self._files_df.filter(pl.col("key") != file_id)
+    def generate_cache_key(self, imdb_id: str, season: str, episode: str, language: str) -> str:
+        """Generate a cache key for search results"""
+        return blake3.blake3(f"{imdb_id}:{season}:{episode}:{language}".encode()).hexdigest(16)
+
+    def _search_storage_key(self, cache_key: SearchCacheKey) -> str:
+        """Hash a search cache key into its SQLite form"""
+        imdb_id, season, episode, language, with_subdl = cache_key
+        return self.generate_cache_key(imdb_id, season, episode, language) + ("_with_subdl" if with_subdl else "")
+
+    def _remember_search(self, cache_key: SearchCacheKey, timestamp: float, body: bytes, etag: str):
+        """Keep serialized search results in memory, evicting the oldest entry when full"""
+        if len(self._search_cache) >= SEARCH_CACHE_MEMORY_SIZE:
+            del self._search_cache[next(iter(self._search_cache))]
+        self._search_cache[cache_key] = (timestamp, body, etag)
+
+    def search_etag(self, body: bytes) -> str:
+        """Generate an entity tag for serialized search results"""
+        return blake3.blake3(body).hexdigest(16)
+
+    def get_search_cache(self, cache_key: SearchCacheKey) -> Optional[Tuple[bytes, str]]:
+        """Get cached search results as JSON bytes, along with their entity tag"""
+        cutoff = time.time() - SEARCH_CACHE_TTL
+
+        entry = self._search_cache.get(cache_key)
+        if entry:
+            if entry[0] > cutoff:
+                return entry[1], entry[2]
+            del self._search_cache[cache_key]
+
+        row = self.conn.execute(
+            "SELECT data, timestamp FROM search_cache WHERE key = ? AND timestamp > ?",
+            (self._search_storage_key(cache_key), cutoff),
+        ).fetchone()
+        if row:
+            body = row[0] if isinstance(row[0], bytes) else row[0].encode()
+            etag = self.search_etag(body)
+            self._remember_search(cache_key, row[1], body, etag)
+            return body, etag
+        return None
 
-        # Add new entry
-        new_row = pl.DataFrame([{"key": file_id, "value": file_json}])
-        self._files_df = pl.concat([self._files_df, new_row])
-        self._save_files()
+    def set_search_cache(self, cache_key: SearchCacheKey, data: Any) -> Tuple[bytes, str]:
+        """Cache search results, returning them serialized to JSON along with their entity tag"""
+        timestamp = time.time()
+        body = orjson.dumps(data)
+        etag = self.search_etag(body)
+        self._remember_search(cache_key, timestamp, body, etag)
+        self._queue_write(
+            "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?)",
+            (self._search_storage_key(cache_key), body, timestamp),
+        )
+        return body, etag
+
+    def get_upstream_response(self, cache_key: str) -> Optional[Tuple[bytes, Optional[str], float]]:
+        """Get a raw upstream response with its entity tag and the time it was last fetched or revalidated"""
+        row = self._get_row("upstream_cache", "body, etag, fetched_at", cache_key)
+        return row[1:] if row else None
+
+    def store_upstream_response(self, cache_key: str, body: bytes, etag: Optional[str]):
+        """Store a raw upstream response"""
+        self._queue_write(
+            "INSERT OR REPLACE INTO upstream_cache VALUES (?, ?, ?, ?)",
+            (cache_key, body, etag, time.time()),
+            ("upstream_cache", cache_key),
+        )
+
+    def touch_upstream_response(self, cache_key: str):
+        """Mark a stored upstream response as fresh again after a 304, without rewriting its body"""
+        self._queue_write("UPDATE upstream_cache SET fetched_at = ? WHERE key = ?", (time.time(), cache_key))
+
+    def prune_upstream_cache(self):
+        """Drop upstream responses that haven't been fetched or revalidated within UPSTREAM_CACHE_TTL"""
+        self._queue_write("DELETE FROM upstream_cache WHERE fetched_at < ?", (time.time() - UPSTREAM_CACHE_TTL,))
+
+    def store_subtitle_info(self, file_id: str, subtitle_id: str, subtitle_info: Dict[str, Any]):
+        """Store subtitle metadata"""
+        self.store_subtitle_info_batch([(file_id, subtitle_id, subtitle_info)])
+
+    def store_subtitle_info_batch(self, subtitles: List[Tuple[str, str, Dict[str, Any]]]):
+        """Store metadata of many subtitles as one executemany, given (file_id, subtitle_id, subtitle_info) tuples"""
+        stored_at = time.time()
+        rows = []
+        for file_id, subtitle_id, subtitle_info in subtitles:
+            subtitle_data = {
+                **subtitle_info,
+                "file_id": file_id,
+                "stored_at": stored_at,
+            }
+            # Search results store far more subtitles than are ever read back, so they only enter the LRU on read
+            # and don't push out the file info that downloads rely on. A stale entry is dropped instead
+            self._info_cache.pop(("subtitles", subtitle_id), None)
+            rows.append((subtitle_id, orjson.dumps(subtitle_data), stored_at))
+        self._queue_writes(
+            "INSERT OR REPLACE INTO subtitles VALUES (?, ?, ?)",
+            rows,
+            [("subtitles", subtitle_id) for subtitle_id, _, _ in rows],
+        )
+
+    def store_file_info(self, file_id: str, file_path: str, original_filename: str):
+        """Store file information"""
+        row = (file_id, file_path, original_filename, time.time())
+        self._cache_info("files", file_id, dict(zip(FILE_COLUMNS, row[1:])))
+        self._queue_write("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", row, ("files", file_id))
+        self._present_file_ids.add(file_id)
 
     def get_file_info(self, file_id: str) -> Optional[Dict[str, Any]]:
         """Get file information"""
-        result = self._files_df.filter(pl.col("key") == file_id)
-        if result.height > 0:
-            return json.loads(result.select("value").item())
+        file_info = self._cached_info("files", file_id)
+        if file_info is not None:
+            return file_info
+
+        row = self._get_row("files", ", ".join(FILE_COLUMNS), file_id)
+        if row:
+            file_info = dict(zip(FILE_COLUMNS, row[1:]))
+            self._cache_info("files", file_id, file_info)
+            return file_info
         return None
 
     def get_subtitle_info(self, subtitle_id: str) -> Optional[Dict[str, Any]]:
         """Get subtitle information"""
-        result = self._subtitles_df.filter(pl.col("key") == subtitle_id)
-        if result.height > 0:
-            return json.loads(result.select("value").item())
+        subtitle_info = self._cached_info("subtitles", subtitle_id)
+        if subtitle_info is not None:
+            return subtitle_info
+
+        row = self._get_row("subtitles", "value", subtitle_id)
+        if row:
+            subtitle_info = orjson.loads(row[1])
+            self._cache_info("subtitles", subtitle_id, subtitle_info)
+            return subtitle_info
         return None
 
     def file_exists(self, file_id: str) -> bool:
         """Check if file is already downloaded and stored"""
+        if file_id in self._present_file_ids:
+            return True
+
         file_info = self.get_file_info(file_id)
-        if file_info:
-            file_path = Path(file_info["file_path"])
-            zip_path = Path(file_info["zip_path"])
-            return file_path.exists() and zip_path.exists()
+        if file_info and os.path.exists(file_info["file_path"]):
+            self._present_file_ids.add(file_id)
+            return True
         return False
 
+    def existing_file_ids(self, file_ids: Iterable[str]) -> set:
+        """Return which of the given files are already downloaded, looking up unknown ones in a single query"""
+        file_ids = set(file_ids)
+        existing = file_ids & self._present_file_ids
+        unknown = tuple(file_ids - existing)
+        if unknown:
+            placeholders = ", ".join("?" * len(unknown))
+            for key, file_path in self.conn.execute(f"SELECT key, file_path FROM files WHERE key IN ({placeholders})", unknown):
+                if os.path.exists(file_path):
+                    self._present_file_ids.add(key)
+                    existing.add(key)
+        return existing
+
+    def rescan_storage(self):
+        """Reconcile the known present files with the storage directory, so files deleted from disk are downloaded again"""
+        # Runs in a worker thread, so it reads through its own connection. Ids stored while the scan runs may
+        # be left out, file_exists then finds them through their stored path again
+        conn = self._connect()
+        try:
+            present_file_ids = self._scan_storage(conn)
+        finally:
+            conn.close()
+        removed = len(self._present_file_ids - present_file_ids)
+        self._present_file_ids = present_file_ids
+        if removed:
+            log.info("Forgot %d subtitle files missing from storage", removed)
+
+    def forget_file(self, file_id: str):
+        """Stop treating a file as downloaded after it was found missing from disk"""
+        self._present_file_ids.discard(file_id)
+
     def get_file_path(self, file_id: str, extension: str = ".srt") -> str:
         """Generate file path for storing subtitle"""
         return str(self.storage_dir / f"{file_id}.srt")
 
-    def get_zip_path(self, file_id: str, extension: str = ".srt") -> str:
-        """Generate zip file path for storing compressed subtitle"""
-        return str(self.storage_dir / f"{file_id}.zip")
-
     def cleanup_old_files(self, max_age_days: int = 30):
         """Clean up old cached files"""
-        current_time = time.time()
-        max_age_seconds = max_age_days * 24 * 60 * 60
-
-        # Get all expired files using vectorized operations
-        files_with_data = []
-        for row in self._files_df.iter_rows(named=True):
-            file_data = json.loads(row["value"])
-            files_with_data.append(
-                {
-                    "key": row["key"],
-                    "file_path": file_data["file_path"],
-                    "zip_path": file_data["zip_path"],
-                    "stored_at": file_data["stored_at"],
-                }
-            )
+        cutoff = time.time() - max_age_days * 24 * 60 * 60
 
+        expired = self.conn.execute("SELECT key, file_path FROM files WHERE stored_at < ?", (cutoff,)).fetchall()
         files_to_remove = []
-        for file_entry in files_with_data:
-            if current_time - file_entry["stored_at"] > max_age_seconds:
-                # Remove physical files
-                try:
-                    Path(file_entry["file_path"]).unlink(missing_ok=True)
-                    Path(file_entry["zip_path"]).unlink(missing_ok=True)
-                    files_to_remove.append(file_entry["key"])
-                except Exception as e:
-                    log.error(f"Error removing old file {file_entry['key']}: {e}")
-
-        # Remove from database using vectorized operations
-        if files_to_remove:
-            self._files_df = self._files_df.filter(~pl.col("key").is_in(files_to_remove))
-            self._save_files()
-
-        # Clean up old search cache using vectorized operations
-        cache_with_data = []
-        for row in self._search_cache_df.iter_rows(named=True):
-            cache_data = json.loads(row["value"])
-            cache_with_data.append({"key": row["key"], "timestamp": cache_data["timestamp"]})
-
-        cache_to_remove = []
-        for cache_entry in cache_with_data:
-            if current_time - cache_entry["timestamp"] > max_age_seconds:
-                cache_to_remove.append(cache_entry["key"])
-
-        if cache_to_remove:
-            self._search_cache_df = self._search_cache_df.filter(~pl.col("key").is_in(cache_to_remove))
-            self._save_search_cache()
-
-        if files_to_remove or cache_to_remove:
-            log.info(f"Cleaned up {len(files_to_remove)} files and {len(cache_to_remove)} cache entries")
+        for key, file_path in expired:
+            # Remove physical files, including zips stored alongside by older versions
+            try:
+                for path in (file_path, os.path.splitext(file_path)[0] + ".zip"):
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                files_to_remove.append((key,))
+                self._info_cache.pop(("files", key), None)
+                self._present_file_ids.discard(key)
+            except Exception as e:
+                log.error("Error removing old file %s: %s", key, e)
+
+        if files_to_remove and len(files_to_remove) == len(expired):
+            # Everything expired was removed from disk, drop the rows with one range delete
+            self._queue_write("DELETE FROM files WHERE stored_at < ?", (cutoff,))
+        elif files_to_remove:
+            self._queue_writes("DELETE FROM files WHERE key = ?", files_to_remove, [None] * len(files_to_remove))
+
+        # Clean up old search cache
+        cache_removed = self.conn.execute("SELECT COUNT(*) FROM search_cache WHERE timestamp < ?", (cutoff,)).fetchone()[0]
+        if cache_removed:
+            self._queue_write("DELETE FROM search_cache WHERE timestamp < ?", (cutoff,))
+        self._search_cache = {key: entry for key, entry in self._search_cache.items() if entry[0] >= cutoff}
+
+        # Upstream responses don't link to stored files, they only expire
+        self.prune_upstream_cache()
+
+        if files_to_remove or cache_removed:
+            log.info("Cleaned up %d files and %d cache entries", len(files_to_remove), cache_removed)
 
     def get_stats(self) -> Dict[str, int]:
         """Get database statistics"""
+        count = lambda table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]  # noqa: E731
         return {
-            "subtitles_count": self._subtitles_df.height,
-            "files_count": self._files_df.height,
-            "cache_count": self._search_cache_df.height,
+            "subtitles_count": count("subtitles"),
+            "files_count": count("files"),
+            "cache_count": count("search_cache"),
         }
 
+    def close(self):
+        """Flush queued writes, checkpoint the WAL and close the database connections"""
+        if self._writer.is_alive():
+            self._write_queue.put(None)
+            self._writer.join()
+        self.conn.close()
+
     def reload_databases(self):
-        """Reload databases from CSV files (useful for external updates)"""
-        self._load_databases()
+        """Import legacy CSV files dropped into the data directory (useful for external updates)"""
+        self._import_legacy_csv()
@@ -1,5 +1,7 @@
 # Complete Language mappings for OpenSubtitles API compatibility
 # Old API (3-letter ISO 639-2) -> New API (ISO 639-1 or extended codes)
+import sys
+from types import MappingProxyType
 
 LANGUAGE_MAP = {
     # Major languages (your existing mappings + extended)
@@ -147,19 +149,24 @@ LANGUAGE_MAP = {
     "de-ch": "de",  # German (Switzerland) - fallback to de
 }
 
-# Reverse mapping for converting from new API codes to old API codes
-LANGUAGE_MAP_REVERSE = {v: k for k, v in LANGUAGE_MAP.items()}
+# Preferred old code where multiple old codes map to the same new code
+_PREFERRED_OLD = {
+    "en": "eng",  # Prefer 'eng' over other English variants
+    "pt-PT": "por",  # Portuguese (Portugal)
+    "pt-BR": "pob",  # Portuguese (Brazil)
+    "zh-CN": "chi",  # Chinese (Simplified)
+    "zh-TW": "zht",  # Chinese (Traditional)
+}
 
-# Handle special cases in reverse mapping where multiple old codes map to same new code
-LANGUAGE_MAP_REVERSE.update(
-    {
-        "en": "eng",  # Prefer 'eng' over other English variants
-        "pt-PT": "por",  # Portuguese (Portugal)
-        "pt-BR": "pob",  # Portuguese (Brazil)
-        "zh-CN": "chi",  # Chinese (Simplified)
-        "zh-TW": "zht",  # Chinese (Traditional)
-    }
-)
+# Reverse mapping for converting from new API codes to old API codes,
+# first old code wins unless a preferred one is listed above
+LANGUAGE_MAP_REVERSE = {}
+for _old, _new in LANGUAGE_MAP.items():
+    if _new in _PREFERRED_OLD:
+        LANGUAGE_MAP_REVERSE[_new] = _PREFERRED_OLD[_new]
+    elif _new not in LANGUAGE_MAP_REVERSE:
+        LANGUAGE_MAP_REVERSE[_new] = _old
+del _old, _new
 
 # Language names for display purposes
 LANGUAGE_NAMES = {
@@ -345,25 +352,40 @@ SUBDL_LANGUAGE_MAP = {
 }
 
 
+# Freeze the maps and intern their strings so lookups can hit the pointer-compare fast path
+def _freeze(mapping):
+    return MappingProxyType({sys.intern(k): sys.intern(v) if isinstance(v, str) else v for k, v in mapping.items()})
+
+
+LANGUAGE_MAP = _freeze(LANGUAGE_MAP)
+LANGUAGE_MAP_REVERSE = _freeze(LANGUAGE_MAP_REVERSE)
+LANGUAGE_NAMES = _freeze(LANGUAGE_NAMES)
+SUBDL_LANGUAGE_MAP = _freeze(SUBDL_LANGUAGE_MAP)
+
+
 # Helper functions
-def get_new_api_language(old_code):
+# Codes usually arrive already lowercased, so try the exact key first and only
+# fall back to .lower() on a miss. The bound .get methods are pinned as defaults
+# to skip the global + attribute lookups on every call.
+def get_new_api_language(old_code, _get=LANGUAGE_MAP.get):
     """Convert old API 3-letter code to new API code"""
-    return LANGUAGE_MAP.get(old_code.lower())
+    new_code = _get(old_code)
+    return new_code if new_code is not None else _get(old_code.lower())
 
 
-def get_old_api_language(new_code):
+def get_old_api_language(new_code, _get=LANGUAGE_MAP_REVERSE.get):
     """Convert new API code to old API 3-letter code"""
-    return LANGUAGE_MAP_REVERSE.get(new_code.lower())
+    old_code = _get(new_code)
+    return old_code if old_code is not None else _get(new_code.lower())
 
 
-def get_language_name(old_code):
+def get_language_name(old_code, _get=LANGUAGE_NAMES.get):
     """Get display name for language using old API code"""
-    return LANGUAGE_NAMES.get(old_code.lower(), old_code.upper())
+    name = _get(old_code)
+    return name if name is not None else _get(old_code.lower(), old_code.upper())
 
 
 def is_supported_language(code, api_type="old"):
     """Check if language code is supported"""
-    if api_type == "old":
-        return code.lower() in LANGUAGE_MAP
-    else:
-        return code.lower() in LANGUAGE_MAP_REVERSE
+    mapping = LANGUAGE_MAP if api_type == "old" else LANGUAGE_MAP_REVERSE
+    return code in mapping or code.lower() in mapping
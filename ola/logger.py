@@ -1,16 +1,25 @@
 import logging
 import os
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from logging.handlers import TimedRotatingFileHandler
 from pathlib import Path
 
 IS_DEVELOPMENT = os.getenv("ENVIRONMENT", "production") == "development"
 
 
+# (expires_at, base_dir, path) of the last generated filename, only rebuilt after local midnight
+_filename_cache = (0.0, None, None)
+
+
 # Create log handlers
 def _get_filename(base_dir="logs"):
-    current_date = datetime.now().strftime("%y%m%d")
-    return Path(base_dir) / f"ola-{current_date}.log"
+    global _filename_cache
+    if time.time() >= _filename_cache[0] or _filename_cache[1] != base_dir:
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        _filename_cache = (midnight.timestamp(), base_dir, Path(base_dir) / f"ola-{now:%y%m%d}.log")
+    return _filename_cache[2]
 
 
 # Create custom formatter with timezone
@@ -29,8 +38,8 @@ class TimeFormatter(logging.Formatter):
         super().__init__(fmt, datefmt)
 
     def formatTime(self, record, datefmt=None):
-        dt = datetime.fromtimestamp(record.created)
-        return dt.strftime("%H:%M:%S,%f")[:-3]
+        lt = time.localtime(record.created)
+        return f"{lt.tm_hour:02d}:{lt.tm_min:02d}:{lt.tm_sec:02d},{int(record.msecs):03d}"
 
 
 def setup_logging() -> logging.Logger:
@@ -1,17 +1,26 @@
+import asyncio
 import os
 import re
+import shutil
+import struct
+import tempfile
+import time
 import zipfile
-import io
+from contextlib import asynccontextmanager
 from datetime import datetime
-from pathlib import Path
-from typing import Optional, List, Dict, Any
+from functools import lru_cache
+from typing import IO, Optional, List, Dict, Any
 from urllib.parse import urlparse
 
+import blake3
+import deflate
 import httpx
+import orjson
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 
+from .compression import LibdeflateGZipMiddleware
 from .database_manager import DatabaseManager
 from .lang import LANGUAGE_MAP, LANGUAGE_MAP_REVERSE, LANGUAGE_NAMES, SUBDL_LANGUAGE_MAP
 from .logger import logger as log
@@ -19,145 +28,417 @@ from .logger import logger as log
 load_dotenv()
 
 IS_DEVELOPMENT = os.getenv("ENVIRONMENT", "production") == "development"
-BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
+BASE_URL = os.getenv("BASE_URL", "http://localhost:8000").rstrip("/")
 
-app = FastAPI(debug=IS_DEVELOPMENT)
+# Download links in search results point back at this service through its public URL
+FILE_LINK_PREFIX = f"{BASE_URL}/download/file/"
+ZIP_LINK_PREFIX = f"{BASE_URL}/download/zip/"
+
+
+# Seconds between reconciling the set of downloaded subtitles with the storage directory
+STORAGE_RESCAN_INTERVAL = 300
+
+
+async def run_maintenance():
+    """Periodically pick up subtitle files deleted from disk outside of the app and prune expired upstream responses"""
+    while True:
+        await asyncio.sleep(STORAGE_RESCAN_INTERVAL)
+        try:
+            await asyncio.to_thread(db.rescan_storage)
+            db.prune_upstream_cache()
+        except Exception as e:
+            log.error(f"Error during storage maintenance: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Share one HTTP client across requests so connections to the same origin are reused (over HTTP/2)"""
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        follow_redirects=True,
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=100, max_connections=200, keepalive_expiry=30),
+    )
+    maintenance = asyncio.create_task(run_maintenance())
+    yield
+    maintenance.cancel()
+    await app.state.http.aclose()
+
+
+app = FastAPI(debug=IS_DEVELOPMENT, default_response_class=ORJSONResponse, lifespan=lifespan)
+app.add_middleware(LibdeflateGZipMiddleware, minimum_size=512, compresslevel=6)
 
 # Initialize database manager
 db = DatabaseManager()
 
+
 OLD_API_PATTERN = re.compile(r"/search/episode-(\d+)/imdbid-tt(\d+)/season-(\d+)/sublanguageid-(\w+)")
 
 # Pattern for movie searches without season/episode
 MOVIE_API_PATTERN = re.compile(r"/search/imdbid-tt(\d+)/sublanguageid-(\w+)")
 
+
+def parse_search_path(path: str) -> Optional[tuple]:
+    """Parse an old API search path into (imdb_id, season, episode, language), or None if it does not match"""
+    # Well-formed paths are split without the regex engine, anything unusual falls back to the patterns
+    parts = path.split("/")
+    if len(parts) == 4:
+        episode, imdb_id, season, lang = parts
+        if episode[:8] == "episode-" and imdb_id[:9] == "imdbid-tt" and season[:7] == "season-" and lang[:14] == "sublanguageid-":
+            episode, imdb_id, season, lang = episode[8:], imdb_id[9:], season[7:], lang[14:]
+            if episode.isdecimal() and imdb_id.isdecimal() and season.isdecimal() and lang.isalnum():
+                return imdb_id, season, episode, lang
+    elif len(parts) == 2:
+        imdb_id, lang = parts
+        if imdb_id[:9] == "imdbid-tt" and lang[:14] == "sublanguageid-":
+            imdb_id, lang = imdb_id[9:], lang[14:]
+            if imdb_id.isdecimal() and lang.isalnum():
+                return imdb_id, None, None, lang
+
+    match = OLD_API_PATTERN.match("/search/" + path)
+    if match:
+        episode, imdb_id, season, lang = match.groups()
+        return imdb_id, season, episode, lang
+    match = MOVIE_API_PATTERN.match("/search/" + path)
+    if match:
+        imdb_id, lang = match.groups()
+        return imdb_id, None, None, lang
+    return None
+
+
+# Maximum concurrent OpenSubtitles downloads per process, to stay within upstream rate limits
+OPENSUBTITLES_DOWNLOAD_LIMIT = asyncio.Semaphore(5)
+
+# Same for SubDL downloads
+SUBDL_DOWNLOAD_LIMIT = asyncio.Semaphore(5)
+
+# Upstream API calls answered with 429 are retried with exponential backoff, up to this many attempts
+# in total, waiting at most UPSTREAM_MAX_BACKOFF seconds between them
+UPSTREAM_MAX_ATTEMPTS = 3
+UPSTREAM_MAX_BACKOFF = 10
+
+# Size of the chunks downloads are streamed to disk in
+DOWNLOAD_CHUNK_SIZE = 65536
+
+# SubDL zips up to this size are buffered in memory before extraction, larger ones on disk
+SUBDL_ZIP_MEMORY_SIZE = 1 << 20
+
+# Legacy result row for OpenSubtitles results, None fields are filled in per row.
+# Copying it keeps the key order of the old API and skips rebuilding the constant fields
+OPENSUBTITLES_ROW_TEMPLATE = {
+    "MatchedBy": "imdbid",
+    "IDSubMovieFile": "0",
+    "MovieHash": "0",
+    "MovieByteSize": "0",
+    "MovieTimeMS": "0",
+    "IDSubtitleFile": None,
+    "SubFileName": None,
+    "SubActualCD": None,
+    "SubSize": "0",
+    "SubHash": "",
+    "SubLastTS": "",
+    "SubTSGroup": "1",
+    "IDSubtitle": None,
+    "UserID": None,
+    "SubLanguageID": None,
+    "SubFormat": None,
+    "SubSumCD": None,
+    "SubAuthorComment": None,
+    "SubAddDate": None,
+    "SubBad": "0",
+    "SubRating": None,
+    "SubSumVotes": None,
+    "SubDownloadsCnt": None,
+    "MovieReleaseName": None,
+    "MovieFPS": None,
+    "IDMovie": None,
+    "IDMovieImdb": None,
+    "MovieName": None,
+    "MovieNameEng": None,
+    "MovieYear": None,
+    "MovieImdbRating": "0.0",
+    "SubFeatured": "0",
+    "UserNickName": None,
+    "SubTranslator": "",
+    "ISO639": None,
+    "LanguageName": None,
+    "SubComments": "0",
+    "SubHearingImpaired": None,
+    "UserRank": None,
+    "SeriesSeason": None,
+    "SeriesEpisode": None,
+    "MovieKind": None,
+    "SubHD": None,
+    "SeriesIMDBParent": None,
+    "SubEncoding": "UTF-8",
+    "SubAutoTranslation": None,
+    "SubForeignPartsOnly": None,
+    "SubFromTrusted": None,
+    "SubTSGroupHash": "",
+    "SubDownloadLink": None,
+    "ZipDownloadLink": None,
+    "SubtitlesLink": None,
+    "QueryNumber": None,
+    "QueryParameters": None,
+    "Score": None,
+    "Provider": "OpenSubtitles",
+}
+
+# OpenSubtitles search endpoint, responses are reused without revalidation for UPSTREAM_FRESH_TTL seconds
+OPENSUBTITLES_SEARCH_URL = "https://api.opensubtitles.com/api/v1/subtitles"
+UPSTREAM_FRESH_TTL = 900
+
 # SubDL API configuration
 SUBDL_BASE_URL = "https://api.subdl.com/api/v1/subtitles"
 SUBDL_DOWNLOAD_PREFIX = "https://dl.subdl.com"
 
-
-async def download_and_store_subtitle(file_id: str, original_filename: str, api_key: str, user_agent: str) -> bool:
+# Legacy result row for SubDL results, None fields are filled in per row like OPENSUBTITLES_ROW_TEMPLATE
+SUBDL_ROW_TEMPLATE = {
+    "MatchedBy": "imdbid",
+    "IDSubMovieFile": "0",
+    "MovieHash": "0",
+    "MovieByteSize": "0",
+    "MovieTimeMS": "0",
+    "IDSubtitleFile": None,
+    "SubFileName": None,
+    "SubActualCD": "1",
+    "SubSize": "0",
+    "SubHash": "",
+    "SubLastTS": "",
+    "SubTSGroup": "1",
+    "IDSubtitle": None,
+    "UserID": "0",
+    "SubLanguageID": None,
+    "SubFormat": "srt",
+    "SubSumCD": "1",
+    "SubAuthorComment": None,
+    "SubAddDate": "",  # SubDL doesn't provide upload date
+    "SubBad": "0",
+    "SubRating": "0.0",
+    "SubSumVotes": "0",
+    "SubDownloadsCnt": "0",
+    "MovieReleaseName": None,
+    "MovieFPS": "0.000",
+    "IDMovie": "0",
+    "IDMovieImdb": None,
+    "MovieName": "",
+    "MovieNameEng": "",
+    "MovieYear": "",
+    "MovieImdbRating": "0.0",
+    "SubFeatured": "0",
+    "UserNickName": None,
+    "SubTranslator": "",
+    "ISO639": None,
+    "LanguageName": None,
+    "SubComments": "0",
+    "SubHearingImpaired": None,
+    "UserRank": "",
+    "SeriesSeason": None,
+    "SeriesEpisode": None,
+    "MovieKind": None,
+    "SubHD": "0",
+    "SeriesIMDBParent": None,
+    "SubEncoding": "UTF-8",
+    "SubAutoTranslation": "0",
+    "SubForeignPartsOnly": "0",
+    "SubFromTrusted": "0",
+    "SubTSGroupHash": "",
+    "SubDownloadLink": None,
+    "ZipDownloadLink": None,
+    "SubtitlesLink": None,
+    "QueryNumber": None,
+    "QueryParameters": None,
+    "Score": None,
+    "Provider": "SubDL",
+}
+
+# DOS date for 1980-01-01, the earliest timestamp a ZIP entry can carry
+ZIP_DOS_DATE = (1 << 5) | 1
+
+# libdeflate level for on-demand zips, level 1 is over twice as fast as 6 on SRT text for ~5% larger output
+ZIP_COMPRESSION_LEVEL = 1
+
+
+def build_zip(name: str, content: bytes) -> bytes:
+    """Build a single-entry ZIP archive around a libdeflate-compressed payload"""
+    compressed = deflate.deflate_compress(content, ZIP_COMPRESSION_LEVEL)
+    crc = deflate.crc32(content)
+    filename = name.encode()
+
+    local_header = struct.pack("<IHHHHHIIIHH", 0x04034B50, 20, 0, 8, 0, ZIP_DOS_DATE, crc, len(compressed), len(content), len(filename), 0)
+    central_header = struct.pack(
+        "<IHHHHHHIIIHHHHHII", 0x02014B50, 20, 20, 0, 8, 0, ZIP_DOS_DATE, crc, len(compressed), len(content), len(filename), 0, 0, 0, 0, 0, 0
+    )
+    end_of_central_dir = struct.pack(
+        "<IHHHHIIH", 0x06054B50, 0, 0, 1, 1, len(central_header) + len(filename), len(local_header) + len(filename) + len(compressed), 0
+    )
+    return local_header + filename + compressed + central_header + filename + end_of_central_dir
+
+
+@lru_cache(maxsize=512)
+def zip_subtitle_file(file_id: str, file_path: str) -> bytes:
+    """Zip a stored subtitle on demand, repeat downloads are served from memory"""
+    with open(file_path, "rb") as f:
+        return build_zip(f"{file_id}.srt", f.read())
+
+
+ISO_DATETIME_PREFIX = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}")
+
+
+def format_upload_date(upload_date: str) -> str:
+    """Convert an ISO 8601 upload date to the legacy API format"""
+    # OpenSubtitles sends YYYY-MM-DDTHH:MM:SSZ, the legacy format is the same fields with a space
+    if ISO_DATETIME_PREFIX.match(upload_date):
+        return upload_date[:10] + " " + upload_date[11:19]
+    return datetime.fromisoformat(upload_date.replace("Z", "+00:00")).strftime("%Y-%m-%d %H:%M:%S")
+
+
+async def write_response_to_file(response: httpx.Response, file_path: str):
+    """Stream a response body to disk, writes run in a worker thread so they don't stall other requests on the event loop"""
+    f = await asyncio.to_thread(open, file_path, "wb")
+    try:
+        async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+            await asyncio.to_thread(f.write, chunk)
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+async def request_with_retry(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+    """Send an upstream API request, backing off and retrying while it is rate limited"""
+    for attempt in range(UPSTREAM_MAX_ATTEMPTS):
+        r = await client.request(method, url, **kwargs)
+        if r.status_code != 429 or attempt == UPSTREAM_MAX_ATTEMPTS - 1:
+            return r
+
+        # Honour Retry-After when it is given in seconds
+        retry_after = r.headers.get("retry-after", "")
+        delay = min(int(retry_after) if retry_after.isdigit() else 2**attempt, UPSTREAM_MAX_BACKOFF)
+        log.warning(f"Rate limited by {urlparse(url).netloc}, retrying in {delay}s")
+        await asyncio.sleep(delay)
+    return r
+
+
+async def download_and_store_subtitle(client: httpx.AsyncClient, file_id: str, original_filename: str, api_key: str, user_agent: str) -> bool:
     """Download subtitle from OpenSubtitles and store it locally"""
     if db.file_exists(file_id):
         return True  # Already downloaded
 
     url = "https://api.opensubtitles.com/api/v1/download"
 
-    async with httpx.AsyncClient(follow_redirects=True, timeout=60.0) as client:
-        try:
-            # Get download link
-            r = await client.post(
-                url,
-                headers={
-                    "Api-Key": api_key,
-                    "User-Agent": user_agent,
-                    "Content-Type": "application/json",
-                },
-                json={"file_id": int(file_id)},
-            )
+    try:
+        # Get download link
+        r = await request_with_retry(
+            client,
+            "POST",
+            url,
+            headers={
+                "Api-Key": api_key,
+                "User-Agent": user_agent,
+                "Content-Type": "application/json",
+            },
+            json={"file_id": int(file_id)},
+            timeout=60.0,
+        )
 
-            if r.status_code != 200:
-                log.error(f"Failed to get download link for file {file_id}: {r.status_code}")
-                return False
+        if r.status_code != 200:
+            log.error(f"Failed to get download link for file {file_id}: {r.status_code}")
+            return False
 
-            download_data = r.json()
-            download_link = download_data.get("link")
+        download_data = r.json()
+        download_link = download_data.get("link")
 
-            if not download_link:
-                log.error(f"No download link received for file {file_id}")
-                return False
+        if not download_link:
+            log.error(f"No download link received for file {file_id}")
+            return False
 
-            # Download the actual file
-            file_response = await client.get(download_link)
+        # Always use .srt for consistency
+        file_path = db.get_file_path(file_id, ".srt")
 
+        # Stream the actual file straight to disk instead of buffering the whole body first
+        async with client.stream("GET", download_link, timeout=60.0) as file_response:
             if file_response.status_code != 200:
                 log.error(f"Failed to download file {file_id}: {file_response.status_code}")
                 return False
 
-            content = file_response.content
+            await write_response_to_file(file_response, file_path)
 
-            # Determine file extension from original filename
-            # Always use .srt for consistency
-            ext = ".srt"
+        # Store file info in database
+        db.store_file_info(file_id, file_path, original_filename)
 
-            # Store original file
-            file_path = db.get_file_path(file_id, ext)
-            with open(file_path, "wb") as f:
-                f.write(content)
+        log.info(f"Successfully downloaded and stored file {file_id}")
+        return True
 
-            # Store zipped version
-            zip_path = db.get_zip_path(file_id, ext)
-            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                zipf.writestr(f"{file_id}.srt", content)
+    except Exception as e:
+        log.error(f"Error downloading file {file_id}: {e}")
+        return False
 
-            # Store file info in database
-            db.store_file_info(file_id, file_path, zip_path, original_filename)
 
-            log.info(f"Successfully downloaded and stored file {file_id}")
-            return True
+def extract_subdl_zip(file_id: str, zip_source: IO[bytes], file_path: str) -> bool:
+    """Write the first .srt in a SubDL zip to disk, decompressing it incrementally"""
+    try:
+        with zipfile.ZipFile(zip_source) as zip_file:
+            # Get the first .srt file in the zip
+            srt_files = [name for name in zip_file.namelist() if name.lower().endswith(".srt")]
+            if not srt_files:
+                log.error(f"No .srt file found in SubDL zip {file_id}")
+                return False
 
-        except Exception as e:
-            log.error(f"Error downloading file {file_id}: {e}")
-            return False
+            # Store original file
+            with zip_file.open(srt_files[0]) as src, open(file_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, DOWNLOAD_CHUNK_SIZE)
+    except zipfile.BadZipFile:
+        log.error(f"Invalid zip file from SubDL {file_id}")
+        return False
+    return True
 
 
-async def download_and_store_subdl_subtitle(file_id: str, download_url: str, original_filename: str, user_agent: str) -> bool:
+async def download_and_store_subdl_subtitle(
+    client: httpx.AsyncClient, file_id: str, download_url: str, original_filename: str, user_agent: str
+) -> bool:
     """Download subtitle from SubDL and store it locally"""
     if db.file_exists(file_id):
         return True  # Already downloaded
 
-    async with httpx.AsyncClient(follow_redirects=True, timeout=60.0) as client:
-        try:
-            # Download the file directly from SubDL
-            file_response = await client.get(download_url, headers={"User-Agent": user_agent})
+    try:
+        file_path = db.get_file_path(file_id, ".srt")
 
+        # Download the file directly from SubDL
+        async with client.stream("GET", download_url, headers={"User-Agent": user_agent}, timeout=60.0) as file_response:
             if file_response.status_code != 200:
                 log.error(f"Failed to download SubDL file {file_id}: {file_response.status_code}")
                 return False
 
-            content = file_response.content
-
             # Handle different content types
             content_type = file_response.headers.get("content-type", "").lower()
-
-            # If it's a zip file, extract the content
             if "zip" in content_type or original_filename.lower().endswith(".zip"):
-                try:
-                    with zipfile.ZipFile(io.BytesIO(content)) as zip_file:
-                        # Get the first .srt file in the zip
-                        srt_files = [name for name in zip_file.namelist() if name.lower().endswith(".srt")]
-                        if srt_files:
-                            content = zip_file.read(srt_files[0])
+                # A zip can only be opened once it is complete. Small ones are kept in memory,
+                # larger ones spill to a temporary file, and extraction runs in a worker thread
+                with tempfile.SpooledTemporaryFile(max_size=SUBDL_ZIP_MEMORY_SIZE) as zip_source:
+                    async for chunk in file_response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        # In-memory writes stay on the event loop, a write that spills or lands on disk runs in a worker thread
+                        if zip_source.tell() + len(chunk) > SUBDL_ZIP_MEMORY_SIZE:
+                            await asyncio.to_thread(zip_source.write, chunk)
                         else:
-                            log.error(f"No .srt file found in SubDL zip {file_id}")
-                            return False
-                except zipfile.BadZipFile:
-                    log.error(f"Invalid zip file from SubDL {file_id}")
-                    return False
+                            zip_source.write(chunk)
+                    if not await asyncio.to_thread(extract_subdl_zip, file_id, zip_source, file_path):
+                        return False
+            else:
+                # Plain subtitles are streamed straight to disk
+                await write_response_to_file(file_response, file_path)
 
-            # Store original file
-            ext = ".srt"
-            file_path = db.get_file_path(file_id, ext)
-            with open(file_path, "wb") as f:
-                f.write(content)
+        # Store file info in database
+        db.store_file_info(file_id, file_path, original_filename)
 
-            # Store zipped version
-            zip_path = db.get_zip_path(file_id, ext)
-            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                zipf.writestr(f"{file_id}.srt", content)
+        log.info(f"Successfully downloaded and stored SubDL file {file_id}")
+        return True
 
-            # Store file info in database
-            db.store_file_info(file_id, file_path, zip_path, original_filename)
-
-            log.info(f"Successfully downloaded and stored SubDL file {file_id}")
-            return True
-
-        except Exception as e:
-            log.error(f"Error downloading SubDL file {file_id}: {e}")
-            return False
+    except Exception as e:
+        log.error(f"Error downloading SubDL file {file_id}: {e}")
+        return False
 
 
 async def search_subdl_subtitles(
+    client: httpx.AsyncClient,
     subdl_api_key: str,
     imdb_id: str,
     old_lang: str,
@@ -195,39 +476,39 @@ async def search_subdl_subtitles(
     else:
         params["type"] = "movie"
 
-    async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
-        try:
-            r = await client.get(
-                SUBDL_BASE_URL,
-                params=params,
-                headers={"User-Agent": user_agent},
-            )
+    try:
+        r = await request_with_retry(
+            client,
+            "GET",
+            SUBDL_BASE_URL,
+            params=params,
+            headers={"User-Agent": user_agent},
+        )
 
-            if r.status_code != 200:
-                log.error(f"SubDL API request failed: {r.status_code} - {r.text}")
-                return []
+        if r.status_code != 200:
+            log.error(f"SubDL API request failed: {r.status_code} - {r.text}")
+            return []
 
-            data = r.json()
-            log.info(f"SubDL search results for IMDB {imdb_id}: status={data.get('status')}, subtitles_count={len(data.get('subtitles', []))}")
+        data = r.json()
+        log.info(f"SubDL search results for IMDB {imdb_id}: status={data.get('status')}, subtitles_count={len(data.get('subtitles', []))}")
 
-            if not data.get("status", False):
-                log.warning(f"SubDL returned status=false for IMDB {imdb_id}: {data.get('error', 'Unknown error')}")
-                return []
+        if not data.get("status", False):
+            log.warning(f"SubDL returned status=false for IMDB {imdb_id}: {data.get('error', 'Unknown error')}")
+            return []
 
-            if "subtitles" not in data:
-                log.warning(f"SubDL returned no subtitles field for IMDB {imdb_id}")
-                return []
+        if "subtitles" not in data:
+            log.warning(f"SubDL returned no subtitles field for IMDB {imdb_id}")
+            return []
 
-            return data["subtitles"]
+        return data["subtitles"]
 
-        except Exception as e:
-            log.error(f"Error searching SubDL: {e}")
-            return []
+    except Exception as e:
+        log.error(f"Error searching SubDL: {e}")
+        return []
 
 
 def transform_subdl_to_opensubtitles_format(
     subdl_subtitle: Dict[str, Any],
-    base_url: str,
     old_lang_code: str,
     imdb_id: str,
     season: Optional[str] = None,
@@ -236,9 +517,14 @@ def transform_subdl_to_opensubtitles_format(
 ) -> Dict[str, Any]:
     """Transform SubDL subtitle format to OpenSubtitles legacy format"""
 
-    # Generate a unique file ID for SubDL subtitle (prefix with 'subdl_')
+    # Generate a file ID for SubDL subtitle (prefix with 'subdl_') from its URL only, so the same
+    # subtitle maps to the same stored file across searches. The hash has to be stable across
+    # restarts, otherwise stored files are never found again and get downloaded once more.
+    # Rows without a URL all hash the same, the result index keeps them apart
     subdl_url = subdl_subtitle.get("url", "")
-    file_id = f"subdl_{abs(hash(subdl_url))}_{index}"
+    file_id = f"subdl_{blake3.blake3(subdl_url.encode()).hexdigest(8)}"
+    if not subdl_url:
+        file_id += f"_{index}"
 
     # Create download URL
     download_url = SUBDL_DOWNLOAD_PREFIX + subdl_url if subdl_url else ""
@@ -260,69 +546,86 @@ def transform_subdl_to_opensubtitles_format(
     if subdl_subtitle.get("hi"):
         hearing_impaired = "1" if subdl_subtitle.get("hi") else "0"
 
-    return {
-        "MatchedBy": "imdbid",
-        "IDSubMovieFile": "0",
-        "MovieHash": "0",
-        "MovieByteSize": "0",
-        "MovieTimeMS": "0",
-        "IDSubtitleFile": file_id,
-        "SubFileName": subdl_subtitle.get("name", ""),
-        "SubActualCD": "1",
-        "SubSize": "0",
-        "SubHash": "",
-        "SubLastTS": "",
-        "SubTSGroup": "1",
-        "IDSubtitle": file_id,  # Use file_id as subtitle_id for SubDL
-        "UserID": "0",
-        "SubLanguageID": old_lang_code,
-        "SubFormat": "srt",
-        "SubSumCD": "1",
-        "SubAuthorComment": author_comment,
-        "SubAddDate": "",  # SubDL doesn't provide upload date
-        "SubBad": "0",
-        "SubRating": "0.0",
-        "SubSumVotes": "0",
-        "SubDownloadsCnt": "0",
-        "MovieReleaseName": release_name,
-        "MovieFPS": "0.000",
-        "IDMovie": "0",
-        "IDMovieImdb": imdb_id,
-        "MovieName": "",
-        "MovieNameEng": "",
-        "MovieYear": "",
-        "MovieImdbRating": "0.0",
-        "SubFeatured": "0",
-        "UserNickName": subdl_subtitle.get("author", "SubDL"),
-        "SubTranslator": "",
-        "ISO639": old_lang_code[:2] if old_lang_code else "en",
-        "LanguageName": LANGUAGE_NAMES.get(old_lang_code, subdl_subtitle.get("lang", "English")),
-        "SubComments": "0",
-        "SubHearingImpaired": hearing_impaired,
-        "UserRank": "",
-        "SeriesSeason": str(subdl_subtitle.get("season", season or "")),
-        "SeriesEpisode": str(subdl_subtitle.get("episode", episode or "")),
-        "MovieKind": "tv" if season or episode else "movie",
-        "SubHD": "0",
-        "SeriesIMDBParent": imdb_id,
-        "SubEncoding": "UTF-8",
-        "SubAutoTranslation": "0",
-        "SubForeignPartsOnly": "0",
-        "SubFromTrusted": "0",
-        "SubTSGroupHash": "",
-        # Use our proxy download endpoints
-        "SubDownloadLink": f"{base_url}/download/file/{file_id}",
-        "ZipDownloadLink": f"{base_url}/download/zip/{file_id}",
-        "SubtitlesLink": download_url,
-        "QueryNumber": str(index),
-        "QueryParameters": {
-            "imdbid": imdb_id,
-            "sublanguageid": old_lang_code,
-            **({"episode": int(episode), "season": int(season)} if episode and season else {}),
-        },
-        "Score": 5.0 - (index * 0.01),  # Lower score than OpenSubtitles to prefer OS results
-        "Provider": "SubDL",  # Add provider info
-    }
+    row = SUBDL_ROW_TEMPLATE.copy()
+    row.update(
+        {
+            "IDSubtitleFile": file_id,
+            "SubFileName": subdl_subtitle.get("name", ""),
+            "IDSubtitle": file_id,  # Use file_id as subtitle_id for SubDL
+            "SubLanguageID": old_lang_code,
+            "SubAuthorComment": author_comment,
+            "MovieReleaseName": release_name,
+            "IDMovieImdb": imdb_id,
+            "UserNickName": subdl_subtitle.get("author", "SubDL"),
+            "ISO639": old_lang_code[:2] if old_lang_code else "en",
+            "LanguageName": LANGUAGE_NAMES.get(old_lang_code, subdl_subtitle.get("lang", "English")),
+            "SubHearingImpaired": hearing_impaired,
+            "SeriesSeason": str(subdl_subtitle.get("season", season or "")),
+            "SeriesEpisode": str(subdl_subtitle.get("episode", episode or "")),
+            "MovieKind": "tv" if season or episode else "movie",
+            "SeriesIMDBParent": imdb_id,
+            # Use our proxy download endpoints
+            "SubDownloadLink": FILE_LINK_PREFIX + file_id,
+            "ZipDownloadLink": ZIP_LINK_PREFIX + file_id,
+            "SubtitlesLink": download_url,
+            "QueryNumber": str(index),
+            "QueryParameters": {
+                "imdbid": imdb_id,
+                "sublanguageid": old_lang_code,
+                **({"episode": int(episode), "season": int(season)} if episode and season else {}),
+            },
+            "Score": 5.0 - (index * 0.01),  # Lower score than OpenSubtitles to prefer OS results
+        }
+    )
+    return row
+
+
+async def search_opensubtitles(
+    client: httpx.AsyncClient, params: Dict[str, str], cache_key: str, api_key: str, user_agent: str
+) -> Optional[Dict[str, Any]]:
+    """Search the OpenSubtitles API, returning the decoded response or None if the request failed"""
+    # Recent responses are reused as is, older ones are revalidated so an unchanged result skips the body
+    cached = db.get_upstream_response(cache_key)
+    if cached and cached[2] > time.time() - UPSTREAM_FRESH_TTL:
+        return orjson.loads(cached[0])
+
+    headers = {"Api-Key": api_key, "User-Agent": user_agent}
+    if cached and cached[1]:
+        headers["If-None-Match"] = cached[1]
+
+    r = await request_with_retry(client, "GET", OPENSUBTITLES_SEARCH_URL, headers=headers, params=params)
+
+    if r.status_code == 304 and cached:
+        db.touch_upstream_response(cache_key)
+        return orjson.loads(cached[0])
+    if r.status_code != 200:
+        log.warning(f"OpenSubtitles API failed with status {r.status_code}")
+        return None
+
+    # Only well-formed results are cached, a maintenance page or truncated body would otherwise be replayed
+    try:
+        data = orjson.loads(r.content)
+    except orjson.JSONDecodeError as e:
+        log.warning(f"OpenSubtitles API returned invalid JSON: {e}")
+        return None
+    if not isinstance(data, dict) or "data" not in data:
+        log.warning("OpenSubtitles API returned no result list")
+        return None
+
+    db.store_upstream_response(cache_key, r.content, r.headers.get("etag"))
+    return data
+
+
+def search_response(request: Request, body: bytes, etag: str) -> Response:
+    """Send serialized search results, or answer 304 Not Modified if the client already has them"""
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "public, max-age=300"}
+
+    # If-None-Match uses weak comparison, so W/"..." matches as well
+    client_etags = [tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")]
+    if "*" in client_etags or headers["ETag"] in client_etags:
+        return Response(status_code=304, headers=headers)
+
+    return Response(body, media_type="application/json", headers=headers)
 
 
 @app.get("/search/{path:path}")
@@ -342,40 +645,34 @@ async def proxy_old_api(
     # Get User-Agent from client request
     user_agent = request.headers.get("user-agent", "OpenSubtitles-Legacy-API v1.0")
 
-    # Try episode pattern first
-    match = OLD_API_PATTERN.match("/search/" + path)
-    if match:
-        episode, imdb_id, season, old_lang = match.groups()
-        has_episode = True
-    else:
-        # Try movie pattern
-        movie_match = MOVIE_API_PATTERN.match("/search/" + path)
-        if movie_match:
-            imdb_id, old_lang = movie_match.groups()
-            episode = season = None
-            has_episode = False
-        else:
-            raise HTTPException(status_code=400, detail="Invalid old API path format")
+    # Pooled upstream client shared by all requests, see lifespan
+    client = request.app.state.http
+
+    parsed = parse_search_path(path)
+    if parsed is None:
+        raise HTTPException(status_code=400, detail="Invalid old API path format")
+    imdb_id, season, episode, old_lang = parsed
+    has_episode = episode is not None
 
     new_lang = LANGUAGE_MAP.get(old_lang, old_lang)
 
     # Check cache first (include subdl in cache key if provided)
-    cache_suffix = "_with_subdl" if subdlKey else ""
-    cache_key = db.generate_cache_key(f"tt{imdb_id}", season, episode, new_lang) + cache_suffix
-    cached_result = db.get_search_cache(cache_key)
+    cache_key = (f"tt{imdb_id}", season, episode, new_lang, bool(subdlKey))
+    cached = db.get_search_cache(cache_key)
 
-    if cached_result:
+    # Empty results are looked up again rather than served from the cache
+    if cached and cached[0] != b"[]":
+        body, etag = cached
         log.info(f"Returning cached result for {cache_key}")
-        return cached_result
+        return search_response(request, body, etag)
 
-    # Get base URL for download links
-    base_url = str(request.url).split("/search/")[0]
+    # The SubDL search doesn't depend on OpenSubtitles, start it now so both run at the same time
+    subdl_search = asyncio.create_task(search_subdl_subtitles(client, subdlKey, imdb_id, old_lang, season, episode, user_agent)) if subdlKey else None
 
     # Start with OpenSubtitles results
     opensubtitles_results = []
 
     # Call the OpenSubtitles API
-    url = "https://api.opensubtitles.com/api/v1/subtitles"
     params = {
         "imdb_id": f"tt{imdb_id}",
         "languages": new_lang,
@@ -386,160 +683,171 @@ async def proxy_old_api(
         params["season_number"] = season
         params["episode_number"] = episode
 
-    async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
-        try:
-            r = await client.get(
-                url,
-                headers={
-                    "Api-Key": apiKey,
-                    "User-Agent": user_agent,
-                },
-                params=params,
-            )
-
-            if r.status_code != 200:
-                log.warning(f"OpenSubtitles API failed with status {r.status_code}")
-            else:
-                new_data = r.json()
-
-                if "data" in new_data:
-                    for idx, item in enumerate(new_data["data"]):
-                        attr = item.get("attributes", {})
-                        feature = attr.get("feature_details", {})
-                        uploader = attr.get("uploader", {})
-                        files = attr.get("files", [])
-                        file_entry = files[0] if files else {}
-
-                        # Fix: Use imdb_id for episodes, keep full format
-                        movie_imdb_id = str(feature.get("imdb_id", "0"))
-                        parent_imdb = str(feature.get("parent_imdb_id", "0"))
-
-                        old_lang_code = LANGUAGE_MAP_REVERSE.get(attr.get("language"), attr.get("language", "eng"))
-
-                        file_id = str(file_entry.get("file_id", "0"))
-                        subtitle_id = attr.get("subtitle_id", "")
+    try:
+        new_data = await search_opensubtitles(client, params, db.generate_cache_key(f"tt{imdb_id}", season, episode, new_lang), apiKey, user_agent)
 
-                        # Download and store the subtitle file
-                        original_filename = file_entry.get("file_name", f"{file_id}.srt")
-                        await download_and_store_subtitle(file_id, original_filename, apiKey, user_agent)
-
-                        # Store subtitle metadata
-                        db.store_subtitle_info(
-                            file_id,
-                            subtitle_id,
-                            {
-                                "language": attr.get("language"),
-                                "download_count": attr.get("download_count", 0),
-                                "hearing_impaired": attr.get("hearing_impaired", False),
-                                "hd": attr.get("hd", False),
-                                "fps": attr.get("fps", 0),
-                                "votes": attr.get("votes", 0),
-                                "ratings": attr.get("ratings", 0),
-                                "from_trusted": attr.get("from_trusted", False),
-                                "foreign_parts_only": attr.get("foreign_parts_only", False),
-                                "upload_date": attr.get("upload_date"),
-                                "release": attr.get("release", ""),
-                                "comments": attr.get("comments", ""),
-                                "feature_details": feature,
-                                "uploader": uploader,
-                                "original_filename": original_filename,
-                            },
-                        )
+        if new_data is not None:
+            # Metadata of all rows is stored together once the downloads are done
+            subtitle_infos = []
 
-                        opensubtitles_results.append(
-                            {
-                                "MatchedBy": "imdbid",
-                                "IDSubMovieFile": "0",
-                                "MovieHash": "0",
-                                "MovieByteSize": "0",
-                                "MovieTimeMS": "0",
-                                "IDSubtitleFile": file_id,
-                                "SubFileName": file_entry.get("file_name", ""),
-                                "SubActualCD": str(file_entry.get("cd_number", 1)),
-                                "SubSize": "0",
-                                "SubHash": "",
-                                "SubLastTS": "",
-                                "SubTSGroup": "1",
-                                "IDSubtitle": subtitle_id,
-                                "UserID": str(uploader.get("uploader_id", "0") if uploader.get("uploader_id") else "0"),
-                                "SubLanguageID": old_lang_code,
-                                "SubFormat": (attr.get("format") if isinstance(attr.get("format"), str) else "srt"),
-                                "SubSumCD": str(attr.get("nb_cd", len(files) or 1)),
-                                "SubAuthorComment": attr.get("comments", ""),
-                                "SubAddDate": (
-                                    datetime.fromisoformat(attr["upload_date"].replace("Z", "+00:00")).strftime("%Y-%m-%d %H:%M:%S")
-                                    if attr.get("upload_date")
-                                    else ""
-                                ),
-                                "SubBad": "0",
-                                "SubRating": str(attr.get("ratings", "0.0")),
-                                "SubSumVotes": str(attr.get("votes", "0")),
-                                "SubDownloadsCnt": str(attr.get("download_count", "0")),
-                                "MovieReleaseName": attr.get("release", ""),
-                                "MovieFPS": str(attr.get("fps", "0.000")),
-                                "IDMovie": str(feature.get("feature_id", "0")),
-                                "IDMovieImdb": movie_imdb_id,
-                                "MovieName": feature.get("title", ""),
-                                "MovieNameEng": feature.get("original_title") or feature.get("title", ""),
-                                "MovieYear": str(feature.get("year", "")),
-                                "MovieImdbRating": "0.0",
-                                "SubFeatured": "0",
-                                "UserNickName": uploader.get("name", "Anonymous"),
-                                "SubTranslator": "",
-                                "ISO639": old_lang_code[:2] if old_lang_code else "en",
-                                "LanguageName": LANGUAGE_NAMES.get(old_lang_code, attr.get("language", "English")),
-                                "SubComments": "0",
-                                "SubHearingImpaired": "1" if attr.get("hearing_impaired") else "0",
-                                "UserRank": uploader.get("rank", ""),
-                                "SeriesSeason": str(feature.get("season_number", season or "")),
-                                "SeriesEpisode": str(feature.get("episode_number", episode or "")),
-                                "MovieKind": feature.get("feature_type", "episode" if has_episode else "movie").lower(),
-                                "SubHD": "1" if attr.get("hd") else "0",
-                                "SeriesIMDBParent": parent_imdb,
-                                "SubEncoding": "UTF-8",
-                                "SubAutoTranslation": "1" if attr.get("machine_translated") else "0",
-                                "SubForeignPartsOnly": "1" if attr.get("foreign_parts_only") else "0",
-                                "SubFromTrusted": "1" if attr.get("from_trusted") else "0",
-                                "SubTSGroupHash": "",
-                                # Use our proxy download endpoints
-                                "SubDownloadLink": f"{base_url}/download/file/{file_id}",
-                                "ZipDownloadLink": f"{base_url}/download/zip/{file_id}",
-                                "SubtitlesLink": attr.get("url", ""),
-                                "QueryNumber": str(idx),
-                                "QueryParameters": {
-                                    "imdbid": imdb_id,
-                                    "sublanguageid": old_lang,
-                                    **({"episode": int(episode), "season": int(season)} if has_episode else {}),
-                                },
-                                "Score": 10.0 - (idx * 0.01),
-                                "Provider": "OpenSubtitles",  # Add provider info
-                            }
-                        )
+            # Look up which files are already stored in one go, repeat searches then skip downloading entirely
+            stored_file_ids = db.existing_file_ids(
+                str(files[0].get("file_id", "0")) for item in new_data["data"] if (files := item.get("attributes", {}).get("files"))
+            )
 
-        except httpx.HTTPStatusError as e:
-            log.error(f"OpenSubtitles HTTP error occurred: {e}")
-        except httpx.RequestError as e:
-            log.error(f"OpenSubtitles request error occurred: {e}")
+            # Language lookups are bound as defaults so each row resolves them as locals
+            async def process_item(
+                idx: int, item: Dict[str, Any], _old_language=LANGUAGE_MAP_REVERSE.get, _language_name=LANGUAGE_NAMES.get
+            ) -> Dict[str, Any]:
+                attr = item.get("attributes", {})
+                attr_get = attr.get
+                feature = attr_get("feature_details", {})
+                feature_get = feature.get
+                uploader = attr_get("uploader", {})
+                uploader_get = uploader.get
+                files = attr_get("files", [])
+                file_entry = files[0] if files else {}
+
+                # Fix: Use imdb_id for episodes, keep full format
+                movie_imdb_id = str(feature_get("imdb_id", "0"))
+                parent_imdb = str(feature_get("parent_imdb_id", "0"))
+
+                language = attr_get("language")
+                old_lang_code = _old_language(language, language or "eng")
+
+                file_id = str(file_entry.get("file_id", "0"))
+                subtitle_id = attr_get("subtitle_id", "")
+                upload_date = attr_get("upload_date")
+                subtitle_format = attr_get("format")
+                uploader_id = uploader_get("uploader_id")
+
+                # Download and store the subtitle file
+                original_filename = file_entry.get("file_name", f"{file_id}.srt")
+                if file_id not in stored_file_ids:
+                    async with OPENSUBTITLES_DOWNLOAD_LIMIT:
+                        await download_and_store_subtitle(client, file_id, original_filename, apiKey, user_agent)
+
+                # Store subtitle metadata
+                subtitle_infos.append(
+                    (
+                        file_id,
+                        subtitle_id,
+                        {
+                            "language": language,
+                            "download_count": attr_get("download_count", 0),
+                            "hearing_impaired": attr_get("hearing_impaired", False),
+                            "hd": attr_get("hd", False),
+                            "fps": attr_get("fps", 0),
+                            "votes": attr_get("votes", 0),
+                            "ratings": attr_get("ratings", 0),
+                            "from_trusted": attr_get("from_trusted", False),
+                            "foreign_parts_only": attr_get("foreign_parts_only", False),
+                            "upload_date": upload_date,
+                            "release": attr_get("release", ""),
+                            "comments": attr_get("comments", ""),
+                            "feature_details": feature,
+                            "uploader": uploader,
+                            "original_filename": original_filename,
+                        },
+                    )
+                )
 
-    # Search SubDL if API key is provided
+                row = OPENSUBTITLES_ROW_TEMPLATE.copy()
+                row.update(
+                    {
+                        "IDSubtitleFile": file_id,
+                        "SubFileName": file_entry.get("file_name", ""),
+                        "SubActualCD": str(file_entry.get("cd_number", 1)),
+                        "IDSubtitle": subtitle_id,
+                        "UserID": str(uploader_id) if uploader_id else "0",
+                        "SubLanguageID": old_lang_code,
+                        "SubFormat": subtitle_format if isinstance(subtitle_format, str) else "srt",
+                        "SubSumCD": str(attr_get("nb_cd", len(files) or 1)),
+                        "SubAuthorComment": attr_get("comments", ""),
+                        "SubAddDate": format_upload_date(upload_date) if upload_date else "",
+                        "SubRating": str(attr_get("ratings", "0.0")),
+                        "SubSumVotes": str(attr_get("votes", "0")),
+                        "SubDownloadsCnt": str(attr_get("download_count", "0")),
+                        "MovieReleaseName": attr_get("release", ""),
+                        "MovieFPS": str(attr_get("fps", "0.000")),
+                        "IDMovie": str(feature_get("feature_id", "0")),
+                        "IDMovieImdb": movie_imdb_id,
+                        "MovieName": feature_get("title", ""),
+                        "MovieNameEng": feature_get("original_title") or feature_get("title", ""),
+                        "MovieYear": str(feature_get("year", "")),
+                        "UserNickName": uploader_get("name", "Anonymous"),
+                        "ISO639": old_lang_code[:2] if old_lang_code else "en",
+                        "LanguageName": _language_name(old_lang_code, language or "English"),
+                        "SubHearingImpaired": "1" if attr_get("hearing_impaired") else "0",
+                        "UserRank": uploader_get("rank", ""),
+                        "SeriesSeason": str(feature_get("season_number", season or "")),
+                        "SeriesEpisode": str(feature_get("episode_number", episode or "")),
+                        "MovieKind": feature_get("feature_type", "episode" if has_episode else "movie").lower(),
+                        "SubHD": "1" if attr_get("hd") else "0",
+                        "SeriesIMDBParent": parent_imdb,
+                        "SubAutoTranslation": "1" if attr_get("machine_translated") else "0",
+                        "SubForeignPartsOnly": "1" if attr_get("foreign_parts_only") else "0",
+                        "SubFromTrusted": "1" if attr_get("from_trusted") else "0",
+                        # Use our proxy download endpoints
+                        "SubDownloadLink": FILE_LINK_PREFIX + file_id,
+                        "ZipDownloadLink": ZIP_LINK_PREFIX + file_id,
+                        "SubtitlesLink": attr_get("url", ""),
+                        "QueryNumber": str(idx),
+                        "QueryParameters": {
+                            "imdbid": imdb_id,
+                            "sublanguageid": old_lang,
+                            **({"episode": int(episode), "season": int(season)} if has_episode else {}),
+                        },
+                        "Score": 10.0 - (idx * 0.01),
+                    }
+                )
+                return row
+
+            # Downloads run concurrently, results keep the upstream order
+            opensubtitles_results.extend(await asyncio.gather(*(process_item(idx, item) for idx, item in enumerate(new_data["data"]))))
+            db.store_subtitle_info_batch(subtitle_infos)
+
+    except httpx.HTTPStatusError as e:
+        log.error(f"OpenSubtitles HTTP error occurred: {e}")
+    except httpx.RequestError as e:
+        log.error(f"OpenSubtitles request error occurred: {e}")
+    except BaseException:
+        # The request fails as a whole, don't leave the SubDL search running on its own
+        if subdl_search:
+            subdl_search.cancel()
+        raise
+
+    # Add SubDL results if API key is provided. Their ids and scores follow the OpenSubtitles
+    # results, so they are only processed once those are in
     subdl_results = []
-    if subdlKey:
+    if subdl_search:
         try:
-            subdl_subtitles = await search_subdl_subtitles(subdlKey, imdb_id, old_lang, season, episode, user_agent)
+            subdl_subtitles = await subdl_search
+            subtitle_infos = []
+            downloads = []
+
+            seen_urls = set()
+
+            for subdl_subtitle in subdl_subtitles:
+                # SubDL can list the same subtitle more than once, keep only its first row
+                subdl_url = subdl_subtitle.get("url", "")
+                if subdl_url:
+                    if subdl_url in seen_urls:
+                        continue
+                    seen_urls.add(subdl_url)
 
-            for idx, subdl_subtitle in enumerate(subdl_subtitles):
                 # Transform SubDL format to OpenSubtitles format
                 transformed_subtitle = transform_subdl_to_opensubtitles_format(
-                    subdl_subtitle, base_url, old_lang, imdb_id, season, episode, len(opensubtitles_results) + idx
+                    subdl_subtitle, old_lang, imdb_id, season, episode, len(opensubtitles_results) + len(subdl_results)
                 )
 
-                # Download and store SubDL subtitle
+                # Queue the SubDL subtitle for download
                 file_id = transformed_subtitle["IDSubtitleFile"]
-                download_url = SUBDL_DOWNLOAD_PREFIX + subdl_subtitle.get("url", "")
+                download_url = SUBDL_DOWNLOAD_PREFIX + subdl_url
                 original_filename = subdl_subtitle.get("name", f"{file_id}.srt")
 
-                if download_url and subdl_subtitle.get("url"):
-                    await download_and_store_subdl_subtitle(file_id, download_url, original_filename, user_agent)
+                if subdl_url:
+                    downloads.append((file_id, download_url, original_filename))
 
                     # Extract release name for metadata
                     release_name = subdl_subtitle.get("release_name", "")
@@ -549,33 +857,44 @@ async def proxy_old_api(
                             release_name = releases[0].get("release", "")
 
                     # Store SubDL subtitle metadata
-                    db.store_subtitle_info(
-                        file_id,
-                        file_id,  # Use file_id as subtitle_id for SubDL
-                        {
-                            "language": subdl_subtitle.get("lang", ""),
-                            "download_count": 0,
-                            "hearing_impaired": bool(subdl_subtitle.get("hi", False)),
-                            "hd": False,
-                            "fps": 0,
-                            "votes": 0,
-                            "ratings": 0,
-                            "from_trusted": False,
-                            "foreign_parts_only": False,
-                            "upload_date": "",
-                            "release": release_name,
-                            "comments": subdl_subtitle.get("comment", ""),
-                            "feature_details": {},
-                            "uploader": {"name": subdl_subtitle.get("author", "SubDL")},
-                            "original_filename": original_filename,
-                            "provider": "SubDL",
-                            "subdl_data": subdl_subtitle,
-                            "subdl_releases": subdl_subtitle.get("releases", []),
-                        },
+                    subtitle_infos.append(
+                        (
+                            file_id,
+                            file_id,  # Use file_id as subtitle_id for SubDL
+                            {
+                                "language": subdl_subtitle.get("lang", ""),
+                                "download_count": 0,
+                                "hearing_impaired": bool(subdl_subtitle.get("hi", False)),
+                                "hd": False,
+                                "fps": 0,
+                                "votes": 0,
+                                "ratings": 0,
+                                "from_trusted": False,
+                                "foreign_parts_only": False,
+                                "upload_date": "",
+                                "release": release_name,
+                                "comments": subdl_subtitle.get("comment", ""),
+                                "feature_details": {},
+                                "uploader": {"name": subdl_subtitle.get("author", "SubDL")},
+                                "original_filename": original_filename,
+                                "provider": "SubDL",
+                                "subdl_data": subdl_subtitle,
+                                "subdl_releases": subdl_subtitle.get("releases", []),
+                            },
+                        )
                     )
 
                 subdl_results.append(transformed_subtitle)
 
+            async def download_subdl(file_id: str, download_url: str, original_filename: str):
+                async with SUBDL_DOWNLOAD_LIMIT:
+                    await download_and_store_subdl_subtitle(client, file_id, download_url, original_filename, user_agent)
+
+            # Downloads run concurrently for files that aren't stored yet, metadata is stored once they are done
+            stored_file_ids = db.existing_file_ids(download[0] for download in downloads)
+            await asyncio.gather(*(download_subdl(*download) for download in downloads if download[0] not in stored_file_ids))
+            db.store_subtitle_info_batch(subtitle_infos)
+
         except Exception as e:
             log.error(f"Error searching SubDL: {e}")
 
@@ -586,11 +905,21 @@ async def proxy_old_api(
     for idx, result in enumerate(all_results):
         result["QueryNumber"] = str(idx)
 
-    # Cache the combined results
-    db.set_search_cache(cache_key, all_results)
+    # Cache the combined results, serializing them once for both the cache and the response
+    body, etag = db.set_search_cache(cache_key, all_results)
 
     log.info(f"Returning {len(opensubtitles_results)} OpenSubtitles + {len(subdl_results)} SubDL results")
-    return all_results
+    return search_response(request, body, etag)
+
+
+def file_stat(file_info: Optional[Dict[str, Any]]) -> Optional[os.stat_result]:
+    """Stat a stored subtitle file, or return None if it has no info or is missing from disk"""
+    if not file_info:
+        return None
+    try:
+        return os.stat(file_info["file_path"])
+    except OSError:
+        return None
 
 
 @app.get("/download/file/{file_id}")
@@ -601,7 +930,9 @@ async def download_file(file_id: str):
     # Get file info from database
     file_info = db.get_file_info(file_id)
 
-    if file_info and Path(file_info["file_path"]).exists():
+    # One stat both checks the file is there and gives FileResponse its size and mtime
+    stat_result = file_stat(file_info)
+    if stat_result:
         # Serve the original SRT file
         filename = f"{file_id}.srt"
         # Use original filename if available and it's from SubDL
@@ -614,12 +945,15 @@ async def download_file(file_id: str):
 
         return FileResponse(
             file_info["file_path"],
+            stat_result=stat_result,
             media_type="text/plain",
             headers={
                 "Content-Disposition": f"attachment; filename={filename}",
             },
         )
 
+    # A file deleted from disk is downloaded again by the next search that returns it
+    db.forget_file(file_id)
     raise HTTPException(status_code=404, detail="Subtitle file not found")
 
 
@@ -631,8 +965,8 @@ async def download_zip(file_id: str):
     # Get file info from database
     file_info = db.get_file_info(file_id)
 
-    if file_info and Path(file_info["zip_path"]).exists():
-        # Serve the zipped file
+    if file_stat(file_info):
+        # Zip the SRT file
         filename = f"{file_id}.zip"
         # Use original filename if available and it's from SubDL
         if file_id.startswith("subdl_") and file_info.get("original_filename"):
@@ -640,12 +974,14 @@ async def download_zip(file_id: str):
             # Change extension to .zip
             filename = original_name.rsplit(".", 1)[0] + ".zip"
 
-        return FileResponse(
-            file_info["zip_path"],
+        # Compressing a zip that isn't cached yet happens in a worker thread, off the event loop
+        return Response(
+            await asyncio.to_thread(zip_subtitle_file, file_id, file_info["file_path"]),
             media_type="application/zip",
             headers={
                 "Content-Disposition": f"attachment; filename={filename}",
             },
         )
 
+    db.forget_file(file_id)
     raise HTTPException(status_code=404, detail="Zipped subtitle file not found")